@@ -8,7 +8,10 @@ set -euo pipefail
 # - Handles process cleanup via controller __del__ and wrapper script
 #
 # Usage:
-#   ./scripts/irctest_safe.sh irctest/server_tests/utf8.py [pytest args]
+#   ./scripts/irctest_safe.sh [--unit NAME] irctest/server_tests/utf8.py [pytest args]
+#
+#   --unit NAME   Name the systemd scope, so the caller can kill the whole
+#                 cgroup afterwards
 #
 # Or use the Python runner for multiple tests:
 #   ./scripts/run_irctest_safe.py [--discover] [--output report.txt] [TEST_FILES...]
@@ -19,6 +22,12 @@ SLIRCD_BIN=${SLIRCD_BIN:-"$REPO_ROOT/target/release/slircd"}
 MEM_MAX=${MEM_MAX:-4G}
 SWAP_MAX=${SWAP_MAX:-0}
 KILL_SLIRCD=${KILL_SLIRCD:-1}
+TASKS_MAX=${TASKS_MAX:-256}
+SCOPE_UNIT=
+if [[ "${1:-}" == "--unit" ]]; then
+  SCOPE_UNIT=${2:?--unit requires a name}
+  shift 2
+fi
 
 if [[ ! -d "$IRCTEST_ROOT" ]]; then
   echo "IRCTEST_ROOT not found: $IRCTEST_ROOT" >&2
@@ -64,9 +73,15 @@ PYTEST_BASE_ARGS=(
   --capture=no
 )
 
-# Run in a memory-capped scope.
-exec systemd-run --user --scope --quiet \
+SCOPE_ARGS=(--user --scope --quiet)
+if [[ -n "$SCOPE_UNIT" ]]; then
+  SCOPE_ARGS+=(--unit "$SCOPE_UNIT")
+fi
+
+# Run in a memory- and pid-capped scope.
+exec systemd-run "${SCOPE_ARGS[@]}" \
   -p "MemoryMax=$MEM_MAX" \
   -p "MemorySwapMax=$SWAP_MAX" \
+  -p "TasksMax=$TASKS_MAX" \
   env SLIRCD_BIN="$SLIRCD_BIN" \
   pytest "${PYTEST_BASE_ARGS[@]}" "$TEST_TARGET" "$@"
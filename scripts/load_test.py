@@ -1,67 +1,348 @@
 
 import asyncio
 import argparse
+import multiprocessing
+import os
 import time
 import random
 import string
 
-async def client_scenario(host, port, user_id, channel, msg_count, delay):
-    reader, writer = await asyncio.open_connection(host, port)
+RECV_BUFFER_SIZE = 64 * 1024
+WRITE_BATCH_SIZE = 64 * 1024
+WRITE_HIGH_WATER = 256 * 1024
+# Upper bound on waiting for the welcome or the JOIN echo
+HANDSHAKE_TIMEOUT = 30.0
+# ERR_NOMOTD sits in the error range but is a normal part of the welcome
+BENIGN_ERROR_NUMERICS = (b"422",)
+
+
+class ClientFailed(Exception):
+    """A client could not complete the scenario."""
+
+
+class TokenBucket:
+    """Paces new connections from a single background refill task."""
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._tokens = asyncio.Queue(maxsize=1)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._refill())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _refill(self):
+        while True:
+            if not self._tokens.full():
+                self._tokens.put_nowait(None)
+            await asyncio.sleep(self._interval)
+
+    async def acquire(self):
+        await self._tokens.get()
+
+
+class IRCProto(asyncio.BufferedProtocol):
+    """Load-test client protocol reading straight into a preallocated buffer.
+
+    Tracks just enough server state (welcome, channel join) for the scenario
+    to sequence itself on real acknowledgements instead of fixed sleeps.
+    """
+
+    def __init__(self):
+        self._buf = bytearray(RECV_BUFFER_SIZE)
+        self._off = 0
+        self._paused = False
+        self._drain_waiter = None
+        self.transport = None
+        self.lost = False
+        self.error = None
+        self.welcomed = asyncio.Event()
+        self.joined = asyncio.Event()
+        self.closed = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+
+    def get_buffer(self, sizehint):
+        if self._off == len(self._buf):
+            # A single line filled the whole buffer; drop it rather than grow.
+            self._off = 0
+        return memoryview(self._buf)[self._off:]
+
+    def buffer_updated(self, nbytes):
+        buf = self._buf
+        end = self._off + nbytes
+        start = 0
+        while (i := buf.find(b"\r\n", start, end)) != -1:
+            self._handle_line(buf, start, i)
+            start = i + 2
+        # Move the trailing partial line to the front of the buffer.
+        tail = end - start
+        if tail and start:
+            buf[:tail] = buf[start:end]
+        self._off = tail
+
+    def _handle_line(self, buf, start, end):
+        if buf.startswith(b":", start, end):
+            sp = buf.find(b" ", start, end)
+            if sp == -1:
+                return
+            start = sp + 1
+        if buf.startswith(b"PING", start, end):
+            self.transport.write(b"PONG" + buf[start + 4:end] + b"\r\n")
+        elif buf.startswith(b"001 ", start, end):
+            self.welcomed.set()
+        elif buf.startswith(b"JOIN ", start, end):
+            self.joined.set()
+        elif not self.joined.is_set() and self._is_error_numeric(buf, start, end):
+            # A rejected NICK or JOIN never gets its 001 or echo; fail the
+            # handshake now instead of waiting out the timeout.
+            self.error = buf[start:end].decode(errors="replace")
+            self.welcomed.set()
+            self.joined.set()
+
+    @staticmethod
+    def _is_error_numeric(buf, start, end):
+        return (end - start > 3
+                and buf[start] in b"45"
+                and buf[start + 1:start + 3].isdigit()
+                and buf[start + 3] == 0x20
+                and buf[start:start + 3] not in BENIGN_ERROR_NUMERICS)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._wake_drain_waiter(None)
+
+    def connection_lost(self, exc):
+        self.lost = True
+        # Release anyone still waiting on the handshake.
+        self.welcomed.set()
+        self.joined.set()
+        self.closed.set()
+        self._wake_drain_waiter(exc or ConnectionResetError("Connection lost"))
+
+    def _wake_drain_waiter(self, exc):
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is None or waiter.done():
+            return
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    def write(self, data):
+        self.transport.write(data)
+
+    async def wait_for_stage(self, event, stage):
+        try:
+            await asyncio.wait_for(event.wait(), HANDSHAKE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ClientFailed(f"{stage} timed out after {HANDSHAKE_TIMEOUT:.0f}s") from None
+        if self.error is not None:
+            raise ClientFailed(f"{stage} rejected: {self.error}")
+        if self.lost:
+            raise ClientFailed(f"connection lost during {stage}")
+
+    async def drain(self):
+        # A failed send closes the transport at once but only reports
+        # connection_lost on a later loop iteration, which an unpaused
+        # writer never yields to.
+        if self.lost or self.transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
+
+async def client_scenario(host, port, user_id, channel, msg_count, delay, connect_sem, bucket):
+    """Run one client; return (messages written, failure reason or None)."""
+    loop = asyncio.get_running_loop()
+    try:
+        async with connect_sem:
+            if bucket is not None:
+                await bucket.acquire()
+            _, proto = await loop.create_connection(IRCProto, host, port)
+    except OSError as exc:
+        return 0, f"connect failed: {exc}"
     nick = f"load_{user_id}_{''.join(random.choices(string.ascii_lowercase, k=4))}"
-    
-    writer.write(f"NICK {nick}\r\nUSER {nick} 0 * :{nick}\r\n".encode())
-    await writer.drain()
 
-    # Simple loop to read initial burst/MOTD (imprecise)
-    # real scenario would wait for logged in
-    await asyncio.sleep(1) 
-    
-    writer.write(f"JOIN {channel}\r\n".encode())
-    await writer.drain()
-    await asyncio.sleep(1)
-
-    for i in range(msg_count):
-        msg = f"PRIVMSG {channel} :Load test message {i} from {nick}\r\n"
-        writer.write(msg.encode())
-        await writer.drain()
-        await asyncio.sleep(delay)
-
-    writer.write(b"QUIT :Done\r\n")
-    await writer.drain()
-    writer.close()
-    await writer.wait_closed()
-
-async def main():
+    sent = 0
+    try:
+        proto.write(f"NICK {nick}\r\nUSER {nick} 0 * :{nick}\r\n".encode())
+        await proto.drain()
+        await proto.wait_for_stage(proto.welcomed, "registration")
+
+        proto.write(f"JOIN {channel}\r\n".encode())
+        await proto.drain()
+        await proto.wait_for_stage(proto.joined, f"JOIN {channel}")
+
+        # Only the counter varies per message; keep the rest pre-encoded.
+        prefix = f"PRIVMSG {channel} :Load test message ".encode()
+        suffix = f" from {nick}\r\n".encode()
+
+        if delay:
+            for i in range(msg_count):
+                proto.write(b"%b%d%b" % (prefix, i, suffix))
+                await proto.drain()
+                sent += 1
+                await asyncio.sleep(delay)
+        else:
+            # Unthrottled: coalesce messages into large writes; drain() only
+            # blocks once the transport is past its high-water mark.
+            buf = bytearray()
+            batched = 0
+            for i in range(msg_count):
+                buf += prefix
+                buf += b"%d" % i
+                buf += suffix
+                batched += 1
+                if len(buf) >= WRITE_BATCH_SIZE:
+                    # The transport may keep a reference, so start a fresh
+                    # buffer rather than clearing this one.
+                    proto.write(buf)
+                    buf = bytearray()
+                    await proto.drain()
+                    sent += batched
+                    batched = 0
+            if buf:
+                proto.write(buf)
+                await proto.drain()
+                sent += batched
+
+        # close() flushes the QUIT before shutting the socket down.
+        proto.write(b"QUIT :Done\r\n")
+    except ClientFailed as exc:
+        return sent, str(exc)
+    except OSError as exc:
+        return sent, f"connection lost while sending: {exc}"
+    finally:
+        proto.transport.close()
+        await proto.closed.wait()
+    return sent, None
+
+def parse_args():
     parser = argparse.ArgumentParser(description="IRC Load Tester")
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=6667)
     parser.add_argument("--users", type=int, default=10)
     parser.add_argument("--messages", type=int, default=100)
     parser.add_argument("--channel", default="#loadtest")
-    parser.add_argument("--rate", type=float, default=10.0, help="Messages per second per user")
-    
-    args = parser.parse_args()
-    delay = 1.0 / args.rate
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="Messages per second per user (0 = unthrottled)")
+    parser.add_argument("--connect-concurrency", type=int, default=200,
+                        help="Maximum simultaneous connection handshakes")
+    parser.add_argument("--connect-rate", type=float, default=0.0,
+                        help="New connections per second (0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Client processes, each pinned to its own CPU")
+    return parser.parse_args()
+
+def install_event_loop_policy():
+    # uvloop raises the harness's own ceiling so it measures the server.
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+async def run_users(args, first_user, users, connect_concurrency, connect_rate):
+    delay = 1.0 / args.rate if args.rate > 0 else 0.0
+    connect_sem = asyncio.Semaphore(connect_concurrency)
+    bucket = TokenBucket(connect_rate) if connect_rate > 0 else None
+    if bucket is not None:
+        bucket.start()
+
+    start = time.monotonic()
+    tasks = [
+        asyncio.create_task(client_scenario(
+            args.host, args.port, first_user + i, args.channel, args.messages, delay,
+            connect_sem, bucket))
+        for i in range(users)
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        if bucket is not None:
+            bucket.stop()
+    duration = time.monotonic() - start
+    sent = sum(count for count, _ in results)
+    errors = [error for _, error in results if error is not None]
+    return duration, sent, len(errors), errors[0] if errors else None
+
+def _worker(first_user, users, args, cpu, results):
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    install_event_loop_policy()
+    # Split connection limits so the totals match a single-process run
+    connect_concurrency = max(1, args.connect_concurrency // args.workers)
+    connect_rate = args.connect_rate / args.workers
+    try:
+        results.put(asyncio.run(run_users(args, first_user, users, connect_concurrency, connect_rate)))
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+
+def run_workers(args):
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = None
+
+    results = multiprocessing.Queue()
+    per_worker, extra = divmod(args.users, args.workers)
+    procs = []
+    first_user = 0
+    for i in range(args.workers):
+        users = per_worker + (1 if i < extra else 0)
+        cpu = cpus[i % len(cpus)] if cpus else None
+        procs.append(multiprocessing.Process(
+            target=_worker, args=(first_user, users, args, cpu, results)))
+        first_user += users
+
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+    failed = sum(1 for proc in procs if proc.exitcode != 0)
+    if failed:
+        raise SystemExit(f"{failed} of {args.workers} workers failed")
+    reports = [results.get() for _ in procs]
+    # Workers start together, so the slowest one bounds the whole run
+    duration = max(report[0] for report in reports)
+    sent = sum(report[1] for report in reports)
+    failed = sum(report[2] for report in reports)
+    first_error = next((report[3] for report in reports if report[3]), None)
+    return duration, sent, failed, first_error
+
+def main():
+    args = parse_args()
 
     print(f"Starting load test: {args.users} users, {args.messages} msgs each, {args.rate} msg/s/user")
+
+    if args.workers > 1:
+        duration, sent, failed, first_error = run_workers(args)
+    else:
+        install_event_loop_policy()
+        duration, sent, failed, first_error = asyncio.run(run_users(
+            args, 0, args.users, args.connect_concurrency, args.connect_rate))
     
-    tasks = []
-    for i in range(args.users):
-        tasks.append(client_scenario(args.host, args.port, i, args.channel, args.messages, delay))
-        # Stagger joins slightly
-        await asyncio.sleep(0.05)
-
-    start = time.time()
-    await asyncio.gather(*tasks)
-    duration = time.time() - start
-    
-    total_msgs = args.users * args.messages
-    print(f"Finished. Total messages: {total_msgs}")
+    print(f"Finished. Total messages: {sent} of {args.users * args.messages}")
     print(f"Duration: {duration:.2f}s")
-    print(f"Throughput: {total_msgs / duration:.2f} msg/s")
+    print(f"Throughput: {sent / duration:.2f} msg/s")
+    if failed:
+        raise SystemExit(f"{failed} of {args.users} clients failed (first: {first_error})")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         pass
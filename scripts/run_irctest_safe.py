@@ -19,12 +19,16 @@ Environment:
     MEM_MAX             Memory limit per test (default: 4G)
     SWAP_MAX            Swap limit per test (default: 0)
     TIMEOUT_PER_TEST    Timeout per test in seconds (default: 300)
+    IDLE_TIMEOUT        Kill a test after this many seconds without output (default: 60)
+    TASKS_MAX           Process/thread limit per test scope (default: 256)
 """
 
 import argparse
 import os
+import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -48,14 +52,36 @@ class SafeTestRunner:
         self.mem_max = os.environ.get("MEM_MAX", "4G")
         self.swap_max = os.environ.get("SWAP_MAX", "0")
         self.timeout_per_test = int(os.environ.get("TIMEOUT_PER_TEST", "300"))
+        self.idle_timeout = int(os.environ.get("IDLE_TIMEOUT", "60"))
         self.safe_runner = script_dir / "irctest_safe.sh"
         
+        # Environment and command prefix are identical for every test file,
+        # so build them once instead of per run_test() call.
+        self._base_env = {
+            **os.environ,
+            "SLIRCD_BIN": str(self.slircd_bin),
+            "MEM_MAX": self.mem_max,
+            "SWAP_MAX": self.swap_max,
+            # run_test sweeps /proc and kills each test's scope itself, so
+            # skip the wrapper's pgrep/sleep/pkill pass on every file
+            "KILL_SLIRCD": "0",
+            # Unbuffered pytest output keeps the idle watchdog accurate
+            "PYTHONUNBUFFERED": "1",
+        }
+        self._runner_cmd = ["bash", str(self.safe_runner)]
+        self._scope_prefix = f"slircd-irctest-{os.getpid()}"
+        self._test_index = 0
+        
         # Results tracking
         self.passed: list[str] = []
         self.failed: list[str] = []
         self.skipped: list[str] = []
         self.errors: dict[str, str] = {}
         
+        # Report file, written incrementally so an aborted run keeps its results
+        self._report = None
+        self._report_path: Optional[str] = None
+        
         self._validate_setup()
     
     def _validate_setup(self) -> None:
@@ -83,9 +109,12 @@ class SafeTestRunner:
             print(f"ERROR: No server_tests directory: {server_tests}", file=sys.stderr)
             return []
         
-        tests = sorted(server_tests.glob("*.py"))
-        # Filter out __init__.py and helper modules
-        tests = [t for t in tests if t.name != "__init__.py" and not t.name.startswith("_")]
+        # Filter out __init__.py and helper modules (both start with "_")
+        with os.scandir(server_tests) as entries:
+            tests = sorted(
+                Path(e.path) for e in entries
+                if e.name.endswith(".py") and not e.name.startswith("_") and e.is_file()
+            )
         return tests
     
     def run_test(self, test_file: Path) -> tuple[str, Optional[str]]:
@@ -100,53 +129,71 @@ class SafeTestRunner:
         print(f"Running: {test_path_relative}")
         print(f"{'='*70}")
         
+        # Each test runs in its own named systemd scope (one cgroup), so
+        # teardown can kill everything it spawned in one shot.
+        scope_unit = f"{self._scope_prefix}-{self._test_index}"
+        self._test_index += 1
+        cleaned_up = False
+        
         try:
             # Pre-cleanup: kill any lingering slircd from previous runs
             self._cleanup_lingering_slircd()
-            time.sleep(0.2)
             
             # Build command
-            env = os.environ.copy()
-            env["SLIRCD_BIN"] = str(self.slircd_bin)
-            env["MEM_MAX"] = self.mem_max
-            env["SWAP_MAX"] = self.swap_max
-            env["KILL_SLIRCD"] = "1"
+            cmd = [*self._runner_cmd, "--unit", scope_unit, str(test_path_relative)]
+            
+            # Run with an overall timeout plus an idle watchdog, so a test
+            # that hangs silently is killed long before the hard ceiling
+            proc = subprocess.Popen(
+                cmd,
+                cwd=self.irctest_root,
+                env=self._base_env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            last_output = [time.monotonic()]
+            pump = threading.Thread(
+                target=self._pump_output,
+                args=(proc, last_output),
+                daemon=True
+            )
+            pump.start()
             
-            cmd = [
-                "bash",
-                str(self.safe_runner),
-                str(test_path_relative)
-            ]
+            start = time.monotonic()
+            error_msg = None
+            while proc.poll() is None:
+                now = time.monotonic()
+                if now - start > self.timeout_per_test:
+                    error_msg = f"Test timeout after {self.timeout_per_test}s"
+                elif now - last_output[0] > self.idle_timeout:
+                    error_msg = f"No output for {self.idle_timeout}s"
+                if error_msg:
+                    proc.kill()
+                    proc.wait()
+                    break
+                time.sleep(0.5)
+            # Kill leftovers before joining the pump: an orphaned slircd that
+            # inherited the output pipe would otherwise keep it open and
+            # stall the join, even after a normal exit
+            self._kill_scope(scope_unit)
+            self._cleanup_lingering_slircd()
+            cleaned_up = True
+            pump.join(timeout=5)
             
-            # Run with timeout
-            try:
-                result = subprocess.run(
-                    cmd,
-                    cwd=self.irctest_root,
-                    env=env,
-                    timeout=self.timeout_per_test,
-                    capture_output=False,
-                    text=True
-                )
-            except subprocess.TimeoutExpired:
-                error_msg = f"Test timeout after {self.timeout_per_test}s"
+            if error_msg:
                 print(f"\n[TIMEOUT] {error_msg}", file=sys.stderr)
                 return ("ERROR", error_msg)
             
-            # Post-cleanup: ensure all slircd processes are killed
-            self._cleanup_lingering_slircd()
-            time.sleep(0.1)
-            
             # Interpret exit code
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 print(f"[PASS] {test_path_relative}")
                 return ("PASS", None)
-            elif result.returncode == 5:
+            elif proc.returncode == 5:
                 # pytest exit code 5 = no tests collected
                 print(f"[SKIP] {test_path_relative} (no tests collected)")
                 return ("SKIP", "No tests found in file")
             else:
-                error_msg = f"Exit code {result.returncode}"
+                error_msg = f"Exit code {proc.returncode}"
                 print(f"[FAIL] {test_path_relative}: {error_msg}", file=sys.stderr)
                 return ("FAIL", error_msg)
         
@@ -156,36 +203,73 @@ class SafeTestRunner:
             return ("ERROR", error_msg)
         
         finally:
-            # Always cleanup
-            self._cleanup_lingering_slircd()
+            # Always cleanup: kill the whole test scope, then sweep for
+            # anything that escaped it (e.g. systemd-run unavailable).
+            # The normal path already did this before joining the pump.
+            if not cleaned_up:
+                self._kill_scope(scope_unit)
+                self._cleanup_lingering_slircd()
     
-    def _cleanup_lingering_slircd(self) -> None:
-        """Kill any lingering slircd processes."""
+    @staticmethod
+    def _pump_output(proc: subprocess.Popen, last_output: list[float]) -> None:
+        """Echo test output as it arrives, recording when output was last seen."""
+        # Read raw chunks rather than lines: pytest's progress dots share a
+        # single line for a whole file and must still count as activity.
+        out = sys.stdout.buffer
+        for chunk in iter(lambda: proc.stdout.read1(4096), b""):
+            last_output[0] = time.monotonic()
+            out.write(chunk)
+            out.flush()
+    
+    def _kill_scope(self, scope_unit: str) -> None:
+        """SIGKILL every process left in a test's systemd scope."""
         try:
-            # Graceful SIGTERM
-            subprocess.run(
-                ["pkill", "-TERM", "-u", os.environ.get("USER", ""), "-f", "slircd.*config.toml"],
-                timeout=1,
-                capture_output=True
-            )
-            time.sleep(0.1)
-            
-            # Force cleanup with SIGKILL
+            # systemd signals the scope's cgroup as a unit (cgroup.kill on
+            # cgroup v2), so no process can fork away mid-cleanup.
             subprocess.run(
-                ["pkill", "-KILL", "-u", os.environ.get("USER", ""), "-f", "slircd.*config.toml"],
-                timeout=1,
+                ["systemctl", "--user", "kill", "--signal=SIGKILL", f"{scope_unit}.scope"],
+                timeout=5,
                 capture_output=True
             )
         except (subprocess.TimeoutExpired, FileNotFoundError):
             pass
     
+    def _cleanup_lingering_slircd(self) -> None:
+        """Kill any lingering test-launched slircd processes (slircd <config.toml>)."""
+        uid = os.getuid()
+        own_pid = os.getpid()
+        try:
+            entries = os.scandir("/proc")
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                pid = int(entry.name)
+                if pid == own_pid:
+                    continue
+                try:
+                    if entry.stat().st_uid != uid:
+                        continue
+                    with open(f"{entry.path}/comm", "rb") as f:
+                        if b"slircd" not in f.read():
+                            continue
+                    with open(f"{entry.path}/cmdline", "rb") as f:
+                        if b"config.toml" not in f.read():
+                            continue
+                    os.kill(pid, signal.SIGKILL)
+                except (OSError, ValueError):
+                    # Process exited mid-scan or is not ours to signal
+                    continue
+    
     def run_tests(self, test_files: list[Path]) -> None:
         """Run all tests and track results."""
         if not test_files:
             print("ERROR: No test files to run", file=sys.stderr)
             return
         
-        start_time = time.time()
+        start_time = time.monotonic()
         
         for test_file in test_files:
             status, error = self.run_test(test_file)
@@ -201,8 +285,10 @@ class SafeTestRunner:
                 self.skipped.append(test_name)
             else:  # ERROR
                 self.errors[test_name] = error or "Unknown error"
+            
+            self._record_result(status, test_name, error)
         
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         self._print_summary(elapsed)
     
     def _print_summary(self, elapsed: float) -> None:
@@ -237,30 +323,58 @@ class SafeTestRunner:
         
         print(f"{'='*70}\n")
     
-    def save_report(self, output_file: Optional[str]) -> None:
-        """Save test results to a file."""
+    def open_report(self, output_file: Optional[str]) -> None:
+        """Open the report file; results are then appended as each test finishes."""
         if not output_file:
             return
         
         try:
-            with open(output_file, "w") as f:
-                f.write(f"Passed: {len(self.passed)}\n")
-                for name in sorted(self.passed):
-                    f.write(f"  PASS: {name}\n")
-                
-                f.write(f"\nFailed: {len(self.failed)}\n")
-                for name in sorted(self.failed):
-                    error = self.errors.get(name, "Unknown")
-                    f.write(f"  FAIL: {name}: {error}\n")
-                
-                f.write(f"\nSkipped: {len(self.skipped)}\n")
-                for name in sorted(self.skipped):
-                    f.write(f"  SKIP: {name}\n")
+            # Line-buffered, so a killed run still leaves every finished result
+            self._report = open(output_file, "w", buffering=1)
+            self._report_path = output_file
+            self._report.write("Results:\n")
+        except OSError as e:
+            print(f"ERROR: Failed to open report: {e}", file=sys.stderr)
+    
+    def _record_result(self, status: str, test_name: str, error: Optional[str]) -> None:
+        """Append a single test result to the report file, if one is open."""
+        if self._report is None:
+            return
+        
+        try:
+            if error:
+                self._report.write(f"  {status}: {test_name}: {error}\n")
+            else:
+                self._report.write(f"  {status}: {test_name}\n")
+        except OSError as e:
+            print(f"ERROR: Failed to write report: {e}", file=sys.stderr)
+    
+    def save_report(self) -> None:
+        """Append the summary to the report file and close it."""
+        if self._report is None:
+            return
+        
+        try:
+            f = self._report
+            f.write(f"\nPassed: {len(self.passed)}\n")
+            for name in sorted(self.passed):
+                f.write(f"  PASS: {name}\n")
+            
+            f.write(f"\nFailed: {len(self.failed)}\n")
+            for name in sorted(self.failed):
+                error = self.errors.get(name, "Unknown")
+                f.write(f"  FAIL: {name}: {error}\n")
             
-            print(f"Report saved to: {output_file}")
+            f.write(f"\nSkipped: {len(self.skipped)}\n")
+            for name in sorted(self.skipped):
+                f.write(f"  SKIP: {name}\n")
+            
+            print(f"Report saved to: {self._report_path}")
         except Exception as e:
             print(f"ERROR: Failed to save report: {e}", file=sys.stderr)
-
+        finally:
+            self._report.close()
+            self._report = None
 
 def main() -> int:
     parser = argparse.ArgumentParser(
@@ -322,8 +436,11 @@ def main() -> int:
         print("ERROR: No test files found", file=sys.stderr)
         return 1
     
-    runner.run_tests(test_files)
-    runner.save_report(args.output)
+    runner.open_report(args.output)
+    try:
+        runner.run_tests(test_files)
+    finally:
+        runner.save_report()
     
     # Exit code: 0 if all passed, 1 if any failed
     return 1 if runner.failed else 0
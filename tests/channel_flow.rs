@@ -21,21 +21,14 @@ async fn test_channel_privmsg_flow() {
         .expect("Failed to connect bob");
 
     // Register both
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Join channel
     alice.join("#test").await.expect("Alice join failed");
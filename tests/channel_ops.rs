@@ -21,21 +21,14 @@ async fn test_part_broadcast() {
         .expect("Failed to connect bob");
 
     // Register both
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Join channel
     alice.join("#ops").await.expect("Alice join failed");
@@ -93,21 +86,14 @@ async fn test_topic_broadcast() {
         .expect("Failed to connect bob");
 
     // Register both
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Join channel sequentially to ensure both are fully in channel
     alice.join("#ops").await.expect("Alice join failed");
@@ -170,21 +156,14 @@ async fn test_invite_flow() {
         .expect("Failed to connect bob");
 
     // Register both
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Alice invites Bob to #invite (channel may not exist yet; RFC allows this)
     alice
@@ -235,20 +214,13 @@ async fn test_kick_requires_op_and_succeeds_with_op() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Bob joins first and gets +o; alice joins without +o
     bob.join("#ops").await.expect("Bob join failed");
@@ -321,20 +293,13 @@ async fn test_names_and_whois() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     alice.join("#ops").await.expect("Alice join failed");
     bob.join("#ops").await.expect("Bob join failed");
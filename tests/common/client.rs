@@ -33,6 +33,7 @@ impl TestClient {
     /// Connect to a test server.
     pub async fn connect(address: &str, nick: &str) -> anyhow::Result<Self> {
         let stream = TcpStream::connect(address).await?;
+        stream.set_nodelay(true)?;
 
         // Split stream for reading and writing
         let (read_half, write_half) = stream.into_split();
@@ -55,6 +56,7 @@ impl TestClient {
         tls: TlsClientConfig,
     ) -> anyhow::Result<Self> {
         let stream = TcpStream::connect(address).await?;
+        stream.set_nodelay(true)?;
         let tls_stream = connect_tls_stream(stream, &tls).await?;
 
         let (read_half, write_half) = tokio::io::split(tls_stream);
@@ -72,11 +74,30 @@ impl TestClient {
 
     /// Send a raw IRC message.
     pub async fn send_raw(&mut self, line: &str) -> anyhow::Result<()> {
+        self.write_line(line).await?;
+        self.writer.flush().await?;
+        Ok(())
+    }
+
+    /// Send several raw IRC messages with a single flush.
+    ///
+    /// The lines are coalesced in the write buffer, so a burst such as
+    /// NICK + USER reaches the server in one write instead of one per line.
+    #[allow(dead_code)]
+    pub async fn send_many(&mut self, lines: &[&str]) -> anyhow::Result<()> {
+        for line in lines {
+            self.write_line(line).await?;
+        }
+        self.writer.flush().await?;
+        Ok(())
+    }
+
+    /// Buffer a single line, appending CRLF if missing, without flushing.
+    async fn write_line(&mut self, line: &str) -> anyhow::Result<()> {
         self.writer.write_all(line.as_bytes()).await?;
         if !line.ends_with("\r\n") {
             self.writer.write_all(b"\r\n").await?;
         }
-        self.writer.flush().await?;
         Ok(())
     }
 
@@ -121,16 +142,36 @@ impl TestClient {
         Ok(messages)
     }
 
+    /// Round-trip a PING and return everything received before its PONG.
+    ///
+    /// The server answers each connection in order, so once the PONG arrives
+    /// every reply to earlier commands has been consumed. Use this instead
+    /// of sleeping and draining with short timeouts, and to assert that a
+    /// command produced no reply without waiting out a timeout.
+    #[allow(dead_code)]
+    pub async fn barrier(&mut self) -> anyhow::Result<Vec<Message>> {
+        const TOKEN: &str = "slircd-test-barrier";
+        self.send_raw(&format!("PING :{}", TOKEN)).await?;
+        let mut messages = self
+            .recv_until(
+                |msg| matches!(&msg.command, Command::PONG(_, Some(token)) if token == TOKEN),
+            )
+            .await?;
+        messages.pop();
+        Ok(messages)
+    }
+
     /// Register with the server (NICK + USER).
     #[allow(dead_code)]
     pub async fn register(&mut self) -> anyhow::Result<()> {
-        self.send(Command::NICK(self.nick.clone())).await?;
-        self.send(Command::USER(
+        let nick = Message::from(Command::NICK(self.nick.clone())).to_string();
+        let user = Message::from(Command::USER(
             self.nick.clone(),
             "0".to_string(),
             format!("Test User {}", self.nick),
         ))
-        .await?;
+        .to_string();
+        self.send_many(&[&nick, &user]).await?;
 
         // Wait for RPL_WELCOME (001)
         let messages = self
@@ -11,3 +11,5 @@ pub mod tls;
 pub use client::TestClient;
 #[allow(unused_imports)]
 pub use server::TestServer;
+#[allow(unused_imports)]
+pub use server::test_data_dir;
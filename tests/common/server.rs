@@ -4,13 +4,27 @@
 
 #![allow(dead_code)]
 
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 use std::process::{Child, Command};
 use std::time::Duration;
-use tokio::time::sleep;
+use tokio::time::{Instant, sleep};
 
 use super::tls::{TlsClientConfig, TlsTestPaths, generate_tls_assets};
 
+/// Directory for a test server's config and databases, named by `suffix`.
+///
+/// Prefers tmpfs (`/dev/shm`) so the SQLite and redb writes each test
+/// makes never wait on a disk fsync; falls back to the system temp dir.
+pub(crate) fn test_data_dir(suffix: &str) -> PathBuf {
+    let shm = Path::new("/dev/shm");
+    let base = if shm.is_dir() {
+        shm.to_path_buf()
+    } else {
+        std::env::temp_dir()
+    };
+    base.join(format!("slircd-test-{}", suffix))
+}
+
 /// A test server instance.
 pub struct TestServer {
     child: Child,
@@ -24,7 +38,7 @@ impl TestServer {
     /// Spawn a new test server with the given configuration.
     pub async fn spawn(port: u16) -> anyhow::Result<Self> {
         // Create temporary directory for test data
-        let data_dir = std::env::temp_dir().join(format!("slircd-test-{}", port));
+        let data_dir = test_data_dir(&port.to_string());
         std::fs::create_dir_all(&data_dir)?;
 
         // Create minimal test configuration
@@ -107,7 +121,7 @@ host = "*@*"
 
     /// Spawn a new test server with TLS enabled and client cert verification optional.
     pub async fn spawn_tls(port: u16, tls_port: u16) -> anyhow::Result<Self> {
-        let data_dir = std::env::temp_dir().join(format!("slircd-test-{}", port));
+        let data_dir = test_data_dir(&port.to_string());
         std::fs::create_dir_all(&data_dir)?;
 
         let tls_dir = data_dir.join("tls");
@@ -199,15 +213,24 @@ host = "*@*"
     }
 
     /// Wait until the server is accepting connections.
+    ///
+    /// Polls with exponential backoff (10ms doubling up to 200ms) so a
+    /// fast-starting server is picked up almost immediately.
     async fn wait_until_ready(&self) -> anyhow::Result<()> {
-        for _ in 0..30 {
+        let deadline = Instant::now() + Duration::from_secs(3);
+        let mut delay = Duration::from_millis(10);
+        loop {
             if tokio::net::TcpStream::connect(("127.0.0.1", self.port))
                 .await
                 .is_ok()
             {
                 return Ok(());
             }
-            sleep(Duration::from_millis(100)).await;
+            if Instant::now() >= deadline {
+                break;
+            }
+            sleep(delay).await;
+            delay = (delay * 2).min(Duration::from_millis(200));
         }
         anyhow::bail!("Server failed to start within 3 seconds")
     }
@@ -8,7 +8,7 @@ use std::fs;
 use tokio::time::{Duration, sleep};
 
 mod common;
-use common::TestClient;
+use common::{TestClient, test_data_dir};
 
 /// Generate a unique test directory to avoid conflicts between test runs.
 fn unique_test_dir(prefix: &str) -> std::path::PathBuf {
@@ -17,7 +17,7 @@ fn unique_test_dir(prefix: &str) -> std::path::PathBuf {
         .duration_since(UNIX_EPOCH)
         .unwrap()
         .as_nanos();
-    std::env::temp_dir().join(format!("{}-{}", prefix, ts))
+    test_data_dir(&format!("{}-{}", prefix, ts))
 }
 
 /// Test that REHASH reloads configuration without disconnecting users.
@@ -4,8 +4,22 @@
 mod common;
 
 use common::{TestClient, TestServer};
+use slirc_proto::Command;
 use tokio::time::Duration;
 
+/// Receive until the given MONITOR numeric names `nick`.
+async fn recv_monitor_reply(client: &mut TestClient, code: u16, nick: &str) {
+    client
+        .recv_until(|msg| match &msg.command {
+            Command::Response(resp, args) => {
+                resp.code() == code && args.last().is_some_and(|targets| targets.contains(nick))
+            }
+            _ => false,
+        })
+        .await
+        .expect("recv");
+}
+
 /// Test MONITOR command - track online/offline status of nicks.
 #[tokio::test]
 async fn test_monitor_add_and_status() {
@@ -19,41 +33,22 @@ async fn test_monitor_add_and_status() {
         .await
         .expect("connect");
 
-    alice.register().await.expect("register");
-    bob.register().await.expect("register");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("register");
+    bob_reg.expect("register");
 
     // Drain welcome
-    tokio::time::sleep(Duration::from_millis(100)).await;
-    while alice.recv_timeout(Duration::from_millis(10)).await.is_ok() {}
-    while bob.recv_timeout(Duration::from_millis(10)).await.is_ok() {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("barrier");
+    bob_ready.expect("barrier");
 
-    // Alice monitors bob
+    // Alice monitors bob; RPL_MONONLINE (730) since bob is online
     alice.send_raw("MONITOR + bob\r\n").await.expect("send");
+    recv_monitor_reply(&mut alice, 730, "bob").await;
 
-    // Should get RPL_MONONLINE (730) since bob is online
-    let msg = alice
-        .recv_timeout(Duration::from_secs(2))
-        .await
-        .expect("recv");
-    let s = msg.to_string();
-    assert!(
-        s.contains("730") || s.contains("bob"),
-        "Expected MONONLINE with bob: {}",
-        s
-    );
-
-    // Check status
+    // Status lists bob as online again
     alice.send_raw("MONITOR S\r\n").await.expect("send");
-    let msg = alice
-        .recv_timeout(Duration::from_secs(2))
-        .await
-        .expect("recv");
-    let s = msg.to_string();
-    assert!(
-        s.contains("730") || s.contains("bob"),
-        "Expected status with bob: {}",
-        s
-    );
+    recv_monitor_reply(&mut alice, 730, "bob").await;
 }
 
 /// Test MONITOR - detect when monitored user goes offline.
@@ -69,33 +64,19 @@ async fn test_monitor_offline_notification() {
         .await
         .expect("connect");
 
-    alice.register().await.expect("register");
-    bob.register().await.expect("register");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("register");
+    bob_reg.expect("register");
 
-    // Drain welcome
-    tokio::time::sleep(Duration::from_millis(100)).await;
-    while alice.recv_timeout(Duration::from_millis(10)).await.is_ok() {}
-    while bob.recv_timeout(Duration::from_millis(10)).await.is_ok() {}
-
-    // Alice monitors bob
+    // Alice monitors bob and sees the MONONLINE
     alice.send_raw("MONITOR + bob\r\n").await.expect("send");
-    // Drain the MONONLINE
-    while alice.recv_timeout(Duration::from_millis(100)).await.is_ok() {}
+    recv_monitor_reply(&mut alice, 730, "bob").await;
 
     // Bob quits
     bob.quit(Some("leaving".to_string())).await.expect("quit");
 
     // Alice should get RPL_MONOFFLINE (731)
-    let msg = alice
-        .recv_timeout(Duration::from_secs(2))
-        .await
-        .expect("recv");
-    let s = msg.to_string();
-    assert!(
-        s.contains("731") || s.contains("bob"),
-        "Expected MONOFFLINE: {}",
-        s
-    );
+    recv_monitor_reply(&mut alice, 731, "bob").await;
 }
 
 /// Test METADATA GET/SET on user.
@@ -5,7 +5,7 @@
 
 mod common;
 
-use common::{TestClient, TestServer};
+use common::{TestClient, TestServer, test_data_dir};
 use slirc_proto::Command;
 use std::time::Duration;
 use tokio::time::sleep;
@@ -230,7 +230,7 @@ async fn setup_s2s_env() -> anyhow::Result<(
     TestClient,
     TestClient,
 )> {
-    let test_dir = std::env::temp_dir().join(format!("slircd-s2s-test-{}", uuid::Uuid::new_v4()));
+    let test_dir = test_data_dir(&format!("s2s-{}", uuid::Uuid::new_v4()));
     std::fs::create_dir_all(&test_dir)?;
 
     let db_a = test_dir.join("a.db");
@@ -12,7 +12,7 @@ mod common;
 async fn test_gateway_handshake_concurrency() {
     let port = 56667;
     // Setup custom config with Proxy Protocol enabled
-    let data_dir = std::env::temp_dir().join(format!("slircd-test-proxy-{}", port));
+    let data_dir = common::test_data_dir(&format!("proxy-{}", port));
     std::fs::create_dir_all(&data_dir).unwrap();
     let config_path = data_dir.join("config.toml");
 
@@ -3,7 +3,7 @@
 mod common;
 
 use common::{TestClient, TestServer};
-use slirc_proto::Command;
+use slirc_proto::{Command, Mode, UserMode};
 
 #[tokio::test]
 async fn test_away_command() {
@@ -19,12 +19,7 @@ async fn test_away_command() {
     alice.register().await.expect("Alice registration failed");
 
     // Drain welcome burst
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    alice.barrier().await.expect("Alice barrier failed");
 
     // Set AWAY message
     alice
@@ -82,12 +77,7 @@ async fn test_nick_change() {
     alice.register().await.expect("Alice registration failed");
 
     // Drain welcome burst
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    alice.barrier().await.expect("Alice barrier failed");
 
     // Change nick
     alice
@@ -127,21 +117,14 @@ async fn test_nick_collision_with_channel() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Join channel
     alice.join("#test").await.expect("Alice join failed");
@@ -203,29 +186,25 @@ async fn test_user_mode_changes() {
     alice.register().await.expect("Alice registration failed");
 
     // Drain welcome burst
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    alice.barrier().await.expect("Alice barrier failed");
 
-    // Set +i (invisible) and check for response
-    // Server may send MODE echo or just accept silently
+    // Set +i (invisible); the server echoes the applied change
     alice
         .send_raw("MODE alice +i")
         .await
         .expect("Failed to send MODE");
 
-    // Give server time to process
-    tokio::time::sleep(tokio::time::Duration::from_millis(50)).await;
-
-    // Drain any responses
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let replies = alice.barrier().await.expect("Alice barrier failed");
+    assert!(
+        replies.iter().any(|m| matches!(
+            &m.command,
+            Command::UserMODE(target, modes)
+                if target == "alice"
+                    && modes.iter().any(|mode| matches!(mode, Mode::Plus(UserMode::Invisible, _)))
+        )),
+        "MODE alice +i should be echoed: {:?}",
+        replies
+    );
 
     // Verify the MODE was accepted by querying it back
     alice
@@ -269,12 +248,7 @@ async fn test_userhost_command() {
     alice.register().await.expect("Alice registration failed");
 
     // Drain welcome burst
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    alice.barrier().await.expect("Alice barrier failed");
 
     // Send USERHOST command
     alice
@@ -320,21 +294,14 @@ async fn test_quit_with_reason() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Join same channel
     alice.join("#quit").await.expect("Alice join failed");
@@ -393,21 +360,14 @@ async fn test_notice_command() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Alice sends NOTICE to Bob
     alice
@@ -431,6 +391,14 @@ async fn test_notice_command() {
         }
         other => panic!("Expected NOTICE, got {:?}", other),
     }
+
+    // NOTICE must never trigger an automatic reply to the sender
+    let replies = alice.barrier().await.expect("Alice barrier failed");
+    assert!(
+        replies.is_empty(),
+        "NOTICE should not generate a reply: {:?}",
+        replies
+    );
 }
 
 /// Test ISON command - check if users are online.
@@ -448,21 +416,14 @@ async fn test_ison_command() {
         .await
         .expect("Failed to connect bob");
 
-    alice.register().await.expect("Alice registration failed");
-    bob.register().await.expect("Bob registration failed");
+    let (alice_reg, bob_reg) = tokio::join!(alice.register(), bob.register());
+    alice_reg.expect("Alice registration failed");
+    bob_reg.expect("Bob registration failed");
 
     // Drain welcome bursts
-    tokio::time::sleep(tokio::time::Duration::from_millis(100)).await;
-    while alice
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
-    while bob
-        .recv_timeout(tokio::time::Duration::from_millis(10))
-        .await
-        .is_ok()
-    {}
+    let (alice_ready, bob_ready) = tokio::join!(alice.barrier(), bob.barrier());
+    alice_ready.expect("Alice barrier failed");
+    bob_ready.expect("Bob barrier failed");
 
     // Alice checks if bob and nonexistent are online
     alice